@@ -0,0 +1,306 @@
+"""
+Modo de servicio asyncio: un front end HTTP/1.1 basado en `asyncio.Protocol`.
+
+Cada conexión cuesta un objeto protocolo en el event loop en lugar de un hilo, así que las
+conexiones keep-alive ociosas son baratas. El routeo es el mismo de `handlers.route_request`
+y, como el DAO usa `mysql.connector` (bloqueante), cada petición se atiende en un
+ThreadPoolExecutor acotado a `ASYNC_DB_WORKERS` hilos. La cola de ese executor también está
+acotada (`ASYNC_MAX_PENDING`): por encima se responde 503 en lugar de acumular trabajo.
+"""
+import asyncio
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from http import HTTPStatus
+from typing import Optional
+
+from .handlers import encode_json, route_request
+from .services import PropertyService
+from . import config
+
+
+__all__ = ["AsyncPropertyServer"]
+
+# Tamaño máximo de la línea de petición + cabeceras y del cuerpo aceptados
+_MAX_HEADER_BYTES = 64 * 1024
+_MAX_BODY_BYTES = 64 * 1024
+# Cola de conexiones pendientes de accept(); http.server usa 5
+_BACKLOG = 1024
+
+
+class _HTTPProtocol(asyncio.Protocol):
+    """
+    Una conexión HTTP/1.1. Las peticiones se atienden de una en una y en orden (también
+    las que llegan en pipeline); la conexión se cierra si el cliente lo pide o tras
+    `keepalive_timeout` segundos esperando una petición completa.
+    """
+
+    def __init__(self, server):
+        self._server = server
+        self._transport = None
+        self._buffer = bytearray()
+        self._busy = False  # hay una petición en curso
+        self._eof = False  # el cliente cerró su lado de escritura
+        self._task = None
+        self._idle_handle = None
+
+    # -- Callbacks de asyncio ---------------------------------------------
+    def connection_made(self, transport):
+        self._transport = transport
+        self._server._connections.add(self)
+        self._start_idle_timer()
+
+    def connection_lost(self, exc):
+        self._server._connections.discard(self)
+        self._cancel_idle_timer()
+        self._transport = None
+
+    def data_received(self, data):
+        self._buffer += data
+        if not self._busy:
+            self._process_next()
+        elif len(self._buffer) > _MAX_HEADER_BYTES + _MAX_BODY_BYTES:
+            # Cliente que envía en pipeline más rápido de lo que respondemos
+            self._transport.pause_reading()
+
+    def eof_received(self):
+        # Half-close: el cliente ya no enviará más, pero aún hay que responder lo recibido.
+        # Devolver True mantiene abierto el transporte hasta escribir la respuesta.
+        self._eof = True
+        if not self._busy:
+            self._process_next()
+        return self._busy or None
+
+    # -- Parseo ------------------------------------------------------------
+    def _process_next(self):
+        """Extrae la siguiente petición completa del buffer y la despacha."""
+        if self._transport is None or self._busy:
+            return
+        self._transport.resume_reading()
+
+        # RFC 7230 §3.5: se ignoran las líneas vacías previas a la línea de petición
+        blank = len(self._buffer) - len(self._buffer.lstrip(b"\r\n"))
+        if blank:
+            del self._buffer[:blank]
+        end = self._buffer.find(b"\r\n\r\n")
+        if end < 0:
+            if len(self._buffer) > _MAX_HEADER_BYTES:
+                self._send_error(431, "headers_too_large")
+            return
+        request = _parse_head(bytes(self._buffer[:end]))
+        if request is None:
+            self._send_error(400, "bad_request")
+            return
+        method, target, version, headers = request
+
+        if "transfer-encoding" in headers:
+            self._send_error(501, "not_implemented")
+            return
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            self._send_error(400, "bad_request")
+            return
+        if length < 0 or length > _MAX_BODY_BYTES:
+            self._send_error(413, "payload_too_large")
+            return
+        if len(self._buffer) < end + 4 + length:
+            return  # falta parte del cuerpo
+        del self._buffer[:end + 4 + length]
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+
+        self._busy = True
+        self._cancel_idle_timer()
+        self._task = asyncio.ensure_future(self._respond(method, target, keep_alive))
+
+    async def _respond(self, method, target, keep_alive):
+        if method == "GET":
+            try:
+                result = await self._server._dispatch(self, target)
+            except Exception as exc:
+                result = 500, {"error": "internal_error", "detail": str(exc)}
+            except BaseException:
+                # Cancelación o salida del intérprete: cerramos para no dejar al cliente esperando
+                if self._transport is not None:
+                    self._transport.close()
+                raise
+            if result is None:
+                return
+            code, payload = result
+        else:
+            code, payload = 501, {"error": "not_implemented"}
+
+        if self._transport is None:
+            return
+        keep_alive = keep_alive and not self._server._closing
+        try:
+            self._write_json(code, payload, keep_alive)
+        except Exception as exc:
+            # p. ej. un Decimal de MySQL que json no serializa; aún no se escribió nada
+            print(f"Error al escribir la respuesta: {exc}")
+            try:
+                self._write_json(
+                    500, {"error": "internal_error", "detail": str(exc)}, keep_alive=False)
+            finally:
+                self._transport.close()
+            return
+        if not keep_alive:
+            self._transport.close()
+            return
+        self._busy = False
+        self._start_idle_timer()
+        self._process_next()
+        if self._eof and not self._busy:
+            self._transport.close()
+
+    # -- Respuestas --------------------------------------------------------
+    def _write_json(self, code, payload, keep_alive):
+        body = encode_json(payload)
+        head = (
+            f"HTTP/1.1 {code} {HTTPStatus(code).phrase}\r\n"
+            f"Date: {formatdate(usegmt=True)}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        self._transport.write(head.encode("latin-1") + body)
+
+    def _send_error(self, code, error):
+        """Responde un error de protocolo y cierra: el resto del buffer ya no es confiable."""
+        self._busy = True
+        self._cancel_idle_timer()
+        self._write_json(code, {"error": error}, keep_alive=False)
+        self._transport.close()
+
+    # -- Keep-alive --------------------------------------------------------
+    def _start_idle_timer(self):
+        self._cancel_idle_timer()
+        loop = asyncio.get_running_loop()
+        self._idle_handle = loop.call_later(
+            self._server.keepalive_timeout, self.close)
+
+    def _cancel_idle_timer(self):
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+    def close(self):
+        """Cierra la conexión si no hay una petición en curso."""
+        if self._transport is not None and not self._busy:
+            self._transport.close()
+
+
+def _parse_head(head: bytes):
+    """ Parsea la línea de petición y las cabeceras.
+    Args:
+        head (bytes): Bytes hasta (sin incluir) el primer CRLF CRLF.
+    Returns:
+        tuple: (método, target, versión, dict de cabeceras en minúsculas) o None si es inválida.
+    """
+    try:
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        return None
+    if version not in ("HTTP/1.0", "HTTP/1.1"):
+        return None
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if not sep:
+            return None
+        headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+class AsyncPropertyServer:
+    """
+    Alternativa asyncio a `PropertyServer` con la misma interfaz de arranque.
+    El socket se abre en el constructor, como hace `HTTPServer`, para que `server_address`
+    esté disponible (p. ej. con port=0 en tests) antes de llamar a `serve_forever`.
+    """
+
+    def __init__(
+        self,
+        host: str = config.SERVER_HOST,
+        port: int = config.SERVER_PORT,
+        service: Optional[PropertyService] = None,
+        max_workers: int = config.ASYNC_DB_WORKERS,
+        keepalive_timeout: float = config.ASYNC_KEEPALIVE_TIMEOUT,
+        max_pending: int = config.ASYNC_MAX_PENDING,
+    ):
+        if service is None:
+            service = PropertyService()
+
+        self._service = service
+        self.keepalive_timeout = keepalive_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="property-db")
+        self._sock = socket.create_server((host, port), backlog=_BACKLOG)
+        self.server_address = self._sock.getsockname()
+        self._max_pending = max_pending
+        self._pending = 0  # solo se toca desde el event loop
+        self._connections = set()
+        self._closing = False
+        self._loop = None
+        self._stop_event = None
+
+    async def _dispatch(self, protocol, target):
+        """
+        Ejecuta el routeo (y con él las llamadas bloqueantes al DAO) en el executor.
+        Returns:
+            tuple: (código, payload); 503 si ya hay `max_pending` peticiones en curso, o
+                   None si la conexión se perdió antes de que empezara la consulta.
+        """
+        if self._pending >= self._max_pending:
+            return 503, {"error": "service_unavailable", "detail": "server_busy"}
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._route, protocol, target)
+        finally:
+            self._pending -= 1
+
+    def _route(self, protocol, target):
+        # Corre en el executor: si la conexión se perdió mientras esperaba en cola no consultamos la BD
+        if protocol._transport is None:
+            return None
+        return route_request(self._service, target)
+
+    async def _serve(self):
+        self._stop_event = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        if self._closing:
+            self._stop_event.set()
+        server = await self._loop.create_server(
+            lambda: _HTTPProtocol(self), sock=self._sock)
+        await self._stop_event.wait()
+        server.close()
+        for protocol in list(self._connections):
+            protocol.close()
+        await server.wait_closed()
+
+    def serve_forever(self):  # Bloqueante
+        """Inicia el event loop y espera peticiones hasta `shutdown()` o Ctrl+C."""
+        addr = self.server_address
+        print(f"🟢 Server Properties (asyncio) Listening on http://{addr[0]}:{addr[1]}")
+        try:
+            asyncio.run(self._serve())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._sock.close()
+            print("⛔️ Properties Server stopped.")
+
+    def shutdown(self):
+        """Detiene el servidor; se puede llamar desde otro hilo."""
+        self._closing = True
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop_event.set)
@@ -1,5 +1,18 @@
 import os
 
+
+def _parse_endpoints(raw):
+    """Convierte "host:puerto,host:puerto" en una lista de tuplas (host, puerto).
+    Si se omite el puerto se usa 3306."""
+    endpoints = []
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(":")
+        endpoints.append((host, int(port) if port else 3306))
+    return endpoints
+
 # utilizamos el arreglo os.environ para obtener las variables de entorno, que vendrian de la capa
 # superior: docker-compose, kubernetes, etc.
 
@@ -9,8 +22,30 @@ DB_USER = os.environ.get("DB_USER", "default_user")
 DB_PASSWORD = os.environ.get("DB_PASSWORD", "default_password")
 DB_NAME = os.environ.get("DB_DATABASE", "default_db")
 
+# Multi-endpoint: DB_HOST/DB_PORT es el primario; DB_FAILOVER_HOSTS son los candidatos a los que
+# conmutamos si el primario cae, y DB_READ_REPLICAS las réplicas que atienden las lecturas.
+# Formato: "host:puerto,host:puerto".
+DB_FAILOVER_HOSTS = _parse_endpoints(os.environ.get("DB_FAILOVER_HOSTS", ""))
+DB_READ_REPLICAS = _parse_endpoints(os.environ.get("DB_READ_REPLICAS", ""))
+DB_READ_STRATEGY = os.environ.get("DB_READ_STRATEGY", "round_robin")  # o "latency"
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))  # conexiones ociosas por endpoint
+# Circuit breaker: fallos consecutivos antes de abrir y segundos hasta volver a probar
+DB_BREAKER_THRESHOLD = int(os.environ.get("DB_BREAKER_THRESHOLD", 3))
+DB_BREAKER_COOLDOWN = float(os.environ.get("DB_BREAKER_COOLDOWN", 30))
+# Segundos máximos para abrir una conexión; evita que un host caído bloquee un hilo durante
+# todo el timeout TCP del sistema operativo
+DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", 3))
+
 SERVER_HOST = os.environ.get("SERVER_HOST", "0.0.0.0")
 SERVER_PORT = int(os.environ.get("SERVER_PORT", 8000))
+# "threaded" usa http.server; "asyncio" usa AsyncPropertyServer
+SERVER_MODE = os.environ.get("SERVER_MODE", "threaded")
+# Modo asyncio: hilos que ejecutan las llamadas bloqueantes al DAO y segundos que se mantiene
+# abierta una conexión keep-alive sin peticiones
+ASYNC_DB_WORKERS = int(os.environ.get("ASYNC_DB_WORKERS", 32))
+ASYNC_KEEPALIVE_TIMEOUT = float(os.environ.get("ASYNC_KEEPALIVE_TIMEOUT", 75))
+# Peticiones admitidas a la vez (ejecutándose o en cola del executor); por encima se responde 503
+ASYNC_MAX_PENDING = int(os.environ.get("ASYNC_MAX_PENDING", 4 * ASYNC_DB_WORKERS))
 
 # paginacion
 
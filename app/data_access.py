@@ -1,42 +1,53 @@
 import mysql.connector
 from mysql.connector import errorcode
 from . import config as _default_config_module
+from . import db_pool
 
 
-def get_db_connection(connector=mysql.connector.connect, cfg=_default_config_module):
+# Intentos de una lectura cuando la conexión se pierde a mitad de consulta. El reintento evita el
+# endpoint que falló salvo que sea el único candidato, en cuyo caso se repite sobre el mismo host.
+_READ_ATTEMPTS = 2
+
+
+def get_db_connection(connector=mysql.connector.connect, cfg=_default_config_module,
+                      read_only=False, exclude=()):
     """
-    Establece y devuelve una conexión a la base de datos MySQL.
+    Obtiene una conexión a la base de datos MySQL desde el pool del endpoint elegido.
+    Las lecturas se enrutan a las réplicas y, si un endpoint falla, se conmuta al siguiente.
     Args:
         connector: Función de conexión de mysql.connector.
-        cfg: Módulo de configuración con credenciales de la base de datos.
+        cfg: Módulo de configuración con credenciales y endpoints de la base de datos.
+        read_only (bool): Si es True se prefieren las réplicas de lectura.
+        exclude (iterable): Endpoints a evitar si hay otros disponibles.
     Returns:
         cnx: Conexión a la base de datos.
+    Raises:
+        db_pool.DatabaseUnavailableError: si ningún endpoint entrega una conexión. No se
+            devuelve None para que la caída llegue al handler (503) en vez de a una lista vacía.
     """
     try:
-        cnx = connector(
-            user=cfg.DB_USER,
-            password=cfg.DB_PASSWORD,
-            host=cfg.DB_HOST,
-            port=cfg.DB_PORT,
-            database=cfg.DB_NAME)
+        cnx = db_pool.get_router(connector, cfg).acquire(read_only=read_only, exclude=exclude)
         print("Conexión a la base de datos exitosa.")
         return cnx
-    except mysql.connector.Error as err:
-        if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
+    except db_pool.DatabaseUnavailableError as err:
+        cause = err.__cause__
+        errno = getattr(cause, "errno", None)
+        if errno == errorcode.ER_ACCESS_DENIED_ERROR:
             print(
                 f"Error de acceso: Usuario o contraseña incorrectos para '{cfg.DB_USER}'")
-        elif err.errno == errorcode.ER_BAD_DB_ERROR:
+        elif errno == errorcode.ER_BAD_DB_ERROR:
             print(f"Error: La base de datos '{cfg.DB_NAME}' no existe.")
         else:
-            print(f"Error al conectar a la base de datos: {err}")
-        return None
+            print(f"Error al conectar a la base de datos: {cause or err}")
+        raise
 
 
-def close_db_connection(cnx, cursor=None):
-    """Cierra el cursor y la conexión a la base de datos si están abiertos.
+def close_db_connection(cnx, cursor=None, discard=False):
+    """Cierra el cursor y devuelve la conexión a su pool; si no proviene de uno, la cierra.
     Args:
         cnx: Conexión a la base de datos.
         cursor: Cursor de la base de datos.
+        discard (bool): Si es True la conexión se cierra y cuenta como fallo de su endpoint.
     Returns:
         None
     """
@@ -45,6 +56,8 @@ def close_db_connection(cnx, cursor=None):
             cursor.close()
         except mysql.connector.Error as err:
             print(f"Error al cerrar el cursor: {err}")
+    if cnx and db_pool.release(cnx, discard=discard):
+        return
     if cnx and cnx.is_connected():
         try:
             cnx.close()
@@ -64,6 +77,7 @@ def query_filtered_properties(year=None, city=None, status_names=None,
     omitimos propiedades sin: addres, city o price.
     Los estados base ('pre_venta', 'en_venta', 'vendido') siempre se aplican para los usuarios externos.
     El filtro 'status_names' refina sobre estos estados base.
+    La consulta se enruta a las réplicas de lectura y, si la conexión se pierde, se reintenta evitando ese endpoint.
 
     Args:
         year (int, optional): Año de construcción para filtrar.
@@ -74,91 +88,116 @@ def query_filtered_properties(year=None, city=None, status_names=None,
 
     Returns:
         list: Lista de diccionarios, cada uno representando una propiedad,
-              o None si ocurre un error.
+              o None si ocurre un error en la consulta.
+    Raises:
+        db_pool.DatabaseUnavailableError: si no hay ningún endpoint disponible o si todos los
+            intentos pierden la conexión a mitad de consulta.
     """
-    cnx = get_db_connection(connector=connector, cfg=cfg)
-    if not cnx:
-        return None
+    query, params = _build_properties_query(year, city, status_names, page_number, page_size)
 
-    cursor = None
-    try:
-        # Para obtener resultados como dicts
-        cursor = cnx.cursor(dictionary=True)
-
-        # Construcción de la query base
-        base_query = """
-            WITH LatestStatus AS (
-                SELECT
-                    sh.property_id,
-                    sh.status_id,
-                    sh.update_date,
-                    ROW_NUMBER() OVER (PARTITION BY sh.property_id ORDER BY sh.update_date DESC) as rn
-                FROM status_history sh
-            )
+    failed = []
+    last_err = None
+    for _ in range(_READ_ATTEMPTS):
+        cnx = get_db_connection(connector=connector, cfg=cfg, read_only=True, exclude=failed)
+
+        cursor = None
+        lost_connection = False
+        try:
+            # Para obtener resultados como dicts
+            cursor = cnx.cursor(dictionary=True)
+            cursor.execute(query, tuple(params))
+            properties = cursor.fetchall()
+            return properties
+
+        except (mysql.connector.errors.InterfaceError,
+                mysql.connector.errors.OperationalError) as err:
+            # La lectura es idempotente: descartamos la conexión y reintentamos en otro endpoint
+            print(f"Conexión perdida al obtener propiedades, reintentando: {err}")
+            lost_connection = True
+            last_err = err
+            failed.append(db_pool.endpoint_of(cnx))
+        except mysql.connector.Error as err:
+            print(f"Error al obtener propiedades: {err}")
+            return None
+        finally:
+            close_db_connection(cnx, cursor, discard=lost_connection)
+    # Todos los intentos perdieron la conexión: es una caída, no un resultado vacío
+    raise db_pool.DatabaseUnavailableError(
+        "Se perdió la conexión en todos los intentos de lectura.") from last_err
+
+
+def _build_properties_query(year, city, status_names, page_number, page_size):
+    """
+    Construye la query parametrizada de `query_filtered_properties`.
+    Returns:
+        tuple: (query, params)
+    """
+    # Construcción de la query base
+    base_query = """
+        WITH LatestStatus AS (
             SELECT
-                p.city,
-                p.address,
-                s.name AS status,
-                p.price,
-                p.year,
-                p.description
-            FROM
-                property p
-            JOIN
-                LatestStatus ls ON p.id = ls.property_id
-            JOIN
-                status s ON ls.status_id = s.id
-            WHERE
-                ls.rn = 1
-                AND s.name IN ('pre_venta', 'en_venta', 'vendido')
-                AND p.address IS NOT NULL 
-                AND p.address <> ''
-                AND p.city IS NOT NULL AND p.city <> ''
-                AND p.price IS NOT NULL AND p.price > 0
-        """
-
-        # Lista para almacenar las condiciones de los filtros adicionales
-        conditions = []
-        # Lista para almacenar los parámetros de la query para evitar SQL injection , algunos frameworks lo hacen automáticamente
-        params = []
-
-        if year:
-            conditions.append("p.year = %s")
-            params.append(year)
-        if city:
-            # Usamos LIKE para búsquedas insensibles a mayúsculas/minúsculas, deberíamos
-            # tener en bd y el sistema en general un lenguaje estándar para las ciudades.
-            conditions.append("p.city LIKE LOWER(%s)")
-            params.append(city)
-        if status_names:  # Luego de haber filtrado los estados visibles, refinamos basado en el filtro del usuario
-            if isinstance(status_names, str):  # Si solo viene un estado
-                status_names = [status_names]
-            if status_names:  # Asegurarse que la lista no está vacía
-                # Crear placeholders (%s) para cada estado en la lista (%s, %s, %s, ...)
-                status_list = ', '.join(['%s'] * len(status_names))
-                conditions.append(f"s.name IN ({status_list})")
-                params.extend(status_names)
-
-        # Si hay condiciones adicionales, las añadimos a la query base
-        if conditions:
-            query = f"{base_query} AND {' AND '.join(conditions)}"
-        else:
-            query = base_query
-
-        # Para consistencia en los resultados y paginacion, TODO: ordenamiento por precio u otro
-        query += " ORDER BY p.id"
-        # Manejo de paginación
-        offset = (page_number - 1) * page_size
-        query += " LIMIT %s OFFSET %s;"
-        params.append(page_size)
-        params.append(offset)
-
-        cursor.execute(query, tuple(params))
-        properties = cursor.fetchall()
-        return properties
-
-    except mysql.connector.Error as err:
-        print(f"Error al obtener propiedades: {err}")
-        return None
-    finally:
-        close_db_connection(cnx, cursor)
+                sh.property_id,
+                sh.status_id,
+                sh.update_date,
+                ROW_NUMBER() OVER (PARTITION BY sh.property_id ORDER BY sh.update_date DESC) as rn
+            FROM status_history sh
+        )
+        SELECT
+            p.city,
+            p.address,
+            s.name AS status,
+            p.price,
+            p.year,
+            p.description
+        FROM
+            property p
+        JOIN
+            LatestStatus ls ON p.id = ls.property_id
+        JOIN
+            status s ON ls.status_id = s.id
+        WHERE
+            ls.rn = 1
+            AND s.name IN ('pre_venta', 'en_venta', 'vendido')
+            AND p.address IS NOT NULL 
+            AND p.address <> ''
+            AND p.city IS NOT NULL AND p.city <> ''
+            AND p.price IS NOT NULL AND p.price > 0
+    """
+
+    # Lista para almacenar las condiciones de los filtros adicionales
+    conditions = []
+    # Lista para almacenar los parámetros de la query para evitar SQL injection , algunos frameworks lo hacen automáticamente
+    params = []
+
+    if year:
+        conditions.append("p.year = %s")
+        params.append(year)
+    if city:
+        # Usamos LIKE para búsquedas insensibles a mayúsculas/minúsculas, deberíamos
+        # tener en bd y el sistema en general un lenguaje estándar para las ciudades.
+        conditions.append("p.city LIKE LOWER(%s)")
+        params.append(city)
+    if status_names:  # Luego de haber filtrado los estados visibles, refinamos basado en el filtro del usuario
+        if isinstance(status_names, str):  # Si solo viene un estado
+            status_names = [status_names]
+        if status_names:  # Asegurarse que la lista no está vacía
+            # Crear placeholders (%s) para cada estado en la lista (%s, %s, %s, ...)
+            status_list = ', '.join(['%s'] * len(status_names))
+            conditions.append(f"s.name IN ({status_list})")
+            params.extend(status_names)
+
+    # Si hay condiciones adicionales, las añadimos a la query base
+    if conditions:
+        query = f"{base_query} AND {' AND '.join(conditions)}"
+    else:
+        query = base_query
+
+    # Para consistencia en los resultados y paginacion, TODO: ordenamiento por precio u otro
+    query += " ORDER BY p.id"
+    # Manejo de paginación
+    offset = (page_number - 1) * page_size
+    query += " LIMIT %s OFFSET %s;"
+    params.append(page_size)
+    params.append(offset)
+
+    return query, params
@@ -0,0 +1,321 @@
+"""
+Pools de conexiones por endpoint, circuit breakers y enrutamiento de lecturas.
+
+El primario es DB_HOST/DB_PORT (con DB_FAILOVER_HOSTS como respaldo) y las lecturas se
+reparten entre DB_READ_REPLICAS. Todo se construye a partir de `connector` y `cfg`, de modo
+que los tests pueden inyectar conectores falsos igual que en `data_access`.
+"""
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+
+
+__all__ = ["DatabaseUnavailableError", "CircuitBreaker", "Endpoint", "DatabaseRouter",
+           "get_router", "endpoint_of", "release", "reset_routers"]
+
+
+class DatabaseUnavailableError(mysql.connector.errors.PoolError):
+    """Ningún endpoint pudo entregar una conexión. El último error de conexión va en `__cause__`."""
+
+
+class CircuitBreaker:
+    """
+    Cuenta fallos consecutivos de un endpoint. Al llegar a `threshold` el circuito se abre y
+    se rechazan intentos durante `cooldown` segundos; luego se permite un único intento de
+    prueba (half-open) que lo cierra si tiene éxito o lo vuelve a abrir si falla.
+    """
+
+    def __init__(self, threshold, cooldown, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow_request(self):
+        """Indica si se puede intentar usar el endpoint en este momento."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._clock() - self._opened_at < self.cooldown or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.threshold:
+                self._opened_at = self._clock()
+
+
+class Endpoint:
+    """
+    Un servidor MySQL (host, puerto) con su pool de conexiones ociosas, su circuit breaker
+    y una media móvil de la latencia de ping. Cada entrega de conexión, nueva o reutilizada,
+    aporta exactamente una muestra de ping para que todos los endpoints midan lo mismo.
+    """
+
+    # Peso de la última muestra en la media móvil exponencial de latencia
+    LATENCY_ALPHA = 0.3
+    # Segundos tras los que la latencia se considera vieja y el endpoint se vuelve a medir
+    LATENCY_TTL = 5.0
+
+    def __init__(self, host, port, connector, cfg, pool_size, breaker, connect_timeout=3,
+                 clock=time.monotonic):
+        self.host = host
+        self.port = port
+        self.breaker = breaker
+        self.latency = None  # segundos, None mientras no haya muestras
+        self.sampled_at = None
+        self._connector = connector
+        self._cfg = cfg
+        self._pool_size = pool_size
+        self._connect_timeout = connect_timeout
+        self._clock = clock
+        self._idle = deque()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"Endpoint({self.host}:{self.port})"
+
+    def _ping(self, cnx):
+        """Hace ping con is_connected() y registra su duración como muestra de latencia."""
+        start = self._clock()
+        alive = cnx.is_connected()
+        if alive:
+            elapsed = self._clock() - start
+            if self.latency is None:
+                self.latency = elapsed
+            else:
+                self.latency += self.LATENCY_ALPHA * (elapsed - self.latency)
+            self.sampled_at = self._clock()
+        return alive
+
+    def latency_is_stale(self):
+        return self.sampled_at is None or self._clock() - self.sampled_at > self.LATENCY_TTL
+
+    def acquire(self):
+        """
+        Devuelve una conexión ociosa que siga viva o abre una nueva.
+        Raises:
+            mysql.connector.Error: si no se puede conectar al endpoint.
+        """
+        while True:
+            with self._lock:
+                cnx = self._idle.pop() if self._idle else None
+            if cnx is None:
+                break
+            # El ping sirve de health check además de muestra de latencia
+            if self._ping(cnx):
+                return cnx
+            _close_quietly(cnx)
+
+        cnx = self._connector(
+            user=self._cfg.DB_USER,
+            password=self._cfg.DB_PASSWORD,
+            host=self.host,
+            port=self.port,
+            database=self._cfg.DB_NAME,
+            connection_timeout=self._connect_timeout)
+        # No usamos el tiempo de connect+auth: no es comparable con el ping de una conexión reutilizada
+        self._ping(cnx)
+        return cnx
+
+    def release(self, cnx):
+        """Devuelve la conexión al pool, o la cierra si el pool está lleno o no es reutilizable."""
+        try:
+            # Descarta la transacción implícita del SELECT para no reutilizar un snapshot viejo
+            cnx.rollback()
+        except mysql.connector.Error:
+            _close_quietly(cnx)
+            return
+        with self._lock:
+            if len(self._idle) < self._pool_size:
+                self._idle.append(cnx)
+                return
+        _close_quietly(cnx)
+
+    def close_idle(self):
+        """Cierra todas las conexiones ociosas del pool."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for cnx in idle:
+            _close_quietly(cnx)
+
+
+class DatabaseRouter:
+    """
+    Elige endpoint para cada conexión: las escrituras van al primario (o al siguiente candidato
+    de failover si su circuito está abierto o no responde) y las lecturas a las réplicas, por
+    round-robin o por menor latencia, cayendo al primario si ninguna réplica está disponible.
+    """
+
+    def __init__(self, connector, cfg, clock=time.monotonic):
+        threshold = getattr(cfg, "DB_BREAKER_THRESHOLD", 3)
+        cooldown = getattr(cfg, "DB_BREAKER_COOLDOWN", 30)
+        pool_size = getattr(cfg, "DB_POOL_SIZE", 5)
+        connect_timeout = getattr(cfg, "DB_CONNECT_TIMEOUT", 3)
+
+        def build(host, port):
+            breaker = CircuitBreaker(threshold, cooldown, clock=clock)
+            return Endpoint(host, port, connector, cfg, pool_size, breaker,
+                            connect_timeout=connect_timeout, clock=clock)
+
+        primaries = [(cfg.DB_HOST, cfg.DB_PORT)] + list(getattr(cfg, "DB_FAILOVER_HOSTS", ()))
+        self.primaries = [build(host, port) for host, port in primaries]
+        self.replicas = [build(host, port)
+                         for host, port in getattr(cfg, "DB_READ_REPLICAS", ())]
+        self.strategy = getattr(cfg, "DB_READ_STRATEGY", "round_robin")
+        self._next_replica = 0
+        self._lock = threading.Lock()
+
+    def _ordered_replicas(self):
+        if self.strategy == "latency":
+            # Los endpoints sin muestras recientes van primero para que se vuelvan a medir;
+            # si no, una réplica con una mala muestra antigua no se elegiría nunca más
+            return sorted(self.replicas,
+                          key=lambda ep: 0.0 if ep.latency_is_stale() else ep.latency)
+        with self._lock:
+            start = self._next_replica
+            self._next_replica = (start + 1) % len(self.replicas)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def candidates(self, read_only=False):
+        """Endpoints en el orden en que se intentarán."""
+        if read_only and self.replicas:
+            return self._ordered_replicas() + self.primaries
+        return list(self.primaries)
+
+    def acquire(self, read_only=False, exclude=()):
+        """
+        Devuelve una conexión del primer endpoint disponible. Si todos los circuitos están
+        abiertos se intenta igualmente el último candidato (normalmente el primario): así un
+        corte breve no deja a la aplicación sin base de datos durante todo el cooldown.
+        La contrapartida es que con un único endpoint no hay fail-fast: durante una caída cada
+        petición vuelve a marcar al primario, acotada por DB_CONNECT_TIMEOUT.
+        Args:
+            read_only (bool): si es True se prefieren las réplicas de lectura.
+            exclude (iterable): endpoints a evitar (p. ej. uno que acaba de fallar); se ignora
+                                si no queda ningún otro candidato.
+        Raises:
+            DatabaseUnavailableError: si ningún endpoint entrega una conexión.
+        """
+        candidates = self.candidates(read_only)
+        candidates = [ep for ep in candidates if ep not in exclude] or candidates
+        last_err = None
+        attempted = False
+        for endpoint in candidates:
+            if not endpoint.breaker.allow_request():
+                continue
+            attempted = True
+            try:
+                return self._acquire_from(endpoint)
+            except mysql.connector.Error as err:
+                last_err = err
+        if not attempted:
+            try:
+                return self._acquire_from(candidates[-1])
+            except mysql.connector.Error as err:
+                last_err = err
+        raise DatabaseUnavailableError(
+            "No hay endpoints de base de datos disponibles.") from last_err
+
+    def _acquire_from(self, endpoint):
+        try:
+            cnx = endpoint.acquire()
+        except mysql.connector.Error as err:
+            endpoint.breaker.record_failure()
+            print(f"Fallo al conectar con {endpoint.host}:{endpoint.port}: {err}")
+            raise
+        endpoint.breaker.record_success()
+        _track(cnx, endpoint)
+        return cnx
+
+    def close_idle(self):
+        for endpoint in self.primaries + self.replicas:
+            endpoint.close_idle()
+
+
+# Conexiones entregadas y pendientes de devolver: id(cnx) -> (cnx, endpoint)
+_in_use = {}
+_in_use_lock = threading.Lock()
+
+# Un router por pareja (connector, cfg) para que los tests con conectores falsos no compartan estado
+_routers = {}
+_routers_lock = threading.Lock()
+
+
+def _track(cnx, endpoint):
+    with _in_use_lock:
+        _in_use[id(cnx)] = (cnx, endpoint)
+
+
+def _close_quietly(cnx):
+    try:
+        cnx.close()
+    except mysql.connector.Error as err:
+        print(f"Error al cerrar la conexión: {err}")
+
+
+def get_router(connector, cfg):
+    """Devuelve (creándolo si hace falta) el router asociado a `connector` y `cfg`."""
+    key = (connector, cfg)
+    with _routers_lock:
+        router = _routers.get(key)
+        if router is None:
+            router = _routers[key] = DatabaseRouter(connector, cfg)
+        return router
+
+
+def endpoint_of(cnx):
+    """Devuelve el endpoint del que salió una conexión entregada, o None."""
+    with _in_use_lock:
+        entry = _in_use.get(id(cnx))
+    return entry[1] if entry else None
+
+
+def release(cnx, discard=False):
+    """
+    Devuelve una conexión a su pool. Si `discard` es True la conexión se cierra y el fallo
+    cuenta para el circuit breaker de su endpoint.
+    Returns:
+        bool: False si la conexión no salió de ningún pool (el llamador debe cerrarla).
+    """
+    with _in_use_lock:
+        entry = _in_use.pop(id(cnx), None)
+    if entry is None:
+        return False
+    _, endpoint = entry
+    if discard:
+        endpoint.breaker.record_failure()
+        _close_quietly(cnx)
+    else:
+        endpoint.release(cnx)
+    return True
+
+
+def reset_routers():
+    """Cierra las conexiones ociosas y olvida todos los routers (útil en tests)."""
+    with _routers_lock:
+        routers = list(_routers.values())
+        _routers.clear()
+    for router in routers:
+        router.close_idle()
+    with _in_use_lock:
+        _in_use.clear()
@@ -2,8 +2,10 @@ import json
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 
+from .db_pool import DatabaseUnavailableError
 
-__all__ = ["make_handler"]
+
+__all__ = ["make_handler", "route_request", "encode_json"]
 
 
 class _PropertyRequestHandler(BaseHTTPRequestHandler):
@@ -20,7 +22,7 @@ class _PropertyRequestHandler(BaseHTTPRequestHandler):
         Returns:
             None
         """
-        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        body = encode_json(payload)
         self.send_response(code)
         self.send_header("Content-Type", "application/json; charset=utf-8")
         self.send_header("Content-Length", str(len(body)))
@@ -29,47 +31,67 @@ class _PropertyRequestHandler(BaseHTTPRequestHandler):
 
     # Routeo de peticiones HTTP
     def do_GET(self):
-        parsed = urlparse(self.path)
+        code, payload = route_request(self.server._service, self.path)
+        self._send_json(code, payload)
 
-        if parsed.path.rstrip("/") == "/properties":
-            self._handle_properties(parsed)
-        else:
-            self._send_json(404, {"error": "not_found"})
 
-    # Endpoint: /properties
-    def _handle_properties(self, parsed):
-        """ Maneja la petición GET a /properties.
-        Args:
-            parsed (ParseResult): Resultado del parseo de la URL.
-        Returns:
-            None
-        """
-        qs = parse_qs(parsed.query or "")
-
-        year = qs.get("year",      [None])[0]
-        city = qs.get("city",      [None])[0]
-        status_param = qs.get("status",    [])
-        page_number = qs.get("page",      [None])[0]
-        page_size = qs.get("size",      [None])[0]
-
-        # Permitimos “status=a,b,c” o repetidos ?status=a&status=b
-        status = (
-            status_param[0].split(",") if len(status_param) == 1
-            else status_param or None
-        )
+def encode_json(payload) -> bytes:
+    """Serializa `payload` como el cuerpo JSON (UTF-8) de una respuesta."""
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def route_request(service, path):
+    """ Resuelve una petición GET sin depender del servidor HTTP que la recibe,
+    de modo que el modo `http.server` y el modo asyncio comparten el mismo routeo.
+    Args:
+        service (PropertyService): Servicio que atiende `/properties`.
+        path (str): Ruta solicitada, incluyendo la query string.
+    Returns:
+        tuple: (código de estado HTTP, payload JSON)
+    """
+    parsed = urlparse(path)
+
+    if parsed.path.rstrip("/") == "/properties":
+        return _handle_properties(service, parsed)
+    return 404, {"error": "not_found"}
+
+
+# Endpoint: /properties
+def _handle_properties(service, parsed):
+    """ Maneja la petición GET a /properties.
+    Args:
+        service (PropertyService): Servicio de propiedades.
+        parsed (ParseResult): Resultado del parseo de la URL.
+    Returns:
+        tuple: (código de estado HTTP, payload JSON)
+    """
+    qs = parse_qs(parsed.query or "")
+
+    year = qs.get("year",      [None])[0]
+    city = qs.get("city",      [None])[0]
+    status_param = qs.get("status",    [])
+    page_number = qs.get("page",      [None])[0]
+    page_size = qs.get("size",      [None])[0]
 
-        try:
-            result = self.server._service.get_properties(
-                year=year,
-                city=city,
-                status=status,
-                page_number=page_number,
-                page_size=page_size,
-            )
-            self._send_json(200, result)
-        except Exception as exc:
-            self._send_json(
-                500, {"error": "internal_error", "detail": str(exc)})
+    # Permitimos “status=a,b,c” o repetidos ?status=a&status=b
+    status = (
+        status_param[0].split(",") if len(status_param) == 1
+        else status_param or None
+    )
+
+    try:
+        result = service.get_properties(
+            year=year,
+            city=city,
+            status=status,
+            page_number=page_number,
+            page_size=page_size,
+        )
+        return 200, result
+    except DatabaseUnavailableError as exc:
+        return 503, {"error": "service_unavailable", "detail": str(exc)}
+    except Exception as exc:
+        return 500, {"error": "internal_error", "detail": str(exc)}
 
 
 def make_handler(service):
@@ -1,9 +1,14 @@
+from .async_server import AsyncPropertyServer
 from .server import PropertyServer
+from . import config
 
 
 def main():
     """Función principal para iniciar el servidor de propiedades."""
-    server = PropertyServer()
+    if config.SERVER_MODE == "asyncio":
+        server = AsyncPropertyServer()
+    else:
+        server = PropertyServer()
     server.serve_forever()
 
 
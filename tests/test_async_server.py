@@ -0,0 +1,231 @@
+import json
+import socket
+import struct
+import threading
+import time
+import unittest
+from decimal import Decimal
+from http.client import HTTPConnection
+
+from app.async_server import AsyncPropertyServer
+
+
+class DummyService:
+    """Mock del servicio que registra el hilo desde el que se le llama."""
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.last_call = None
+        self.threads = set()
+        self.calls = 0
+
+    def get_properties(self, **kwargs):
+        self.last_call = kwargs
+        self.calls += 1
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)  # simula una consulta lenta y bloqueante
+        return [{"city": "bogota", "page": kwargs["page_number"]}]
+
+
+class DecimalService:
+    """Mock que devuelve un precio Decimal, como lo entrega mysql.connector para DECIMAL."""
+
+    def get_properties(self, **kwargs):
+        return [{"city": "bogota", "price": Decimal("350000000.00")}]
+
+
+class TestAsyncPropertyServer(unittest.TestCase):
+
+    def _start(self, service, **kwargs):
+        """Inicia el servidor asyncio en un hilo separado."""
+        self.server = AsyncPropertyServer(
+            host="127.0.0.1", port=0, service=service, **kwargs)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join(timeout=5)
+
+    def test_properties_endpoint(self):
+        """Prueba el endpoint de propiedades y que el servicio corre en el executor."""
+        print("Running test_properties_endpoint...")
+        service = DummyService()
+        self._start(service)
+        conn = HTTPConnection("127.0.0.1", self.port)
+        conn.request("GET", "/properties?city=bogota&status=en_venta,vendido&page=2")
+        resp = conn.getresponse()
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(json.loads(resp.read()), [{"city": "bogota", "page": "2"}])
+        self.assertEqual(service.last_call["city"], "bogota")
+        self.assertEqual(service.last_call["status"], ["en_venta", "vendido"])
+        self.assertTrue(all(name.startswith("property-db") for name in service.threads))
+        conn.close()
+        print("test_properties_endpoint passed.\n")
+
+    def test_not_found_y_metodo_no_soportado(self):
+        """Prueba una ruta no válida y un método distinto de GET."""
+        print("Running test_not_found_y_metodo_no_soportado...")
+        self._start(DummyService())
+        conn = HTTPConnection("127.0.0.1", self.port)
+        conn.request("GET", "/unknown")
+        resp = conn.getresponse()
+        self.assertEqual(resp.status, 404)
+        self.assertEqual(json.loads(resp.read())["error"], "not_found")
+        conn.request("POST", "/properties", body=b"{}")
+        resp = conn.getresponse()
+        self.assertEqual(resp.status, 501)
+        resp.read()
+        conn.close()
+        print("test_not_found_y_metodo_no_soportado passed.\n")
+
+    def test_keep_alive_y_pipeline(self):
+        """Prueba que varias peticiones en pipeline por una misma conexión se responden en orden."""
+        print("Running test_keep_alive_y_pipeline...")
+        self._start(DummyService())
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            sock.sendall(
+                b"GET /properties?page=1 HTTP/1.1\r\nHost: x\r\n\r\n"
+                b"GET /properties?page=2 HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+            data = b""
+            while chunk := sock.recv(65536):
+                data += chunk
+        responses = data.split(b"HTTP/1.1 200 OK")[1:]
+        self.assertEqual(len(responses), 2)
+        self.assertIn(b"Connection: keep-alive", responses[0])
+        self.assertIn(b'"page": "1"', responses[0])
+        self.assertIn(b"Connection: close", responses[1])
+        self.assertIn(b'"page": "2"', responses[1])
+        print("test_keep_alive_y_pipeline passed.\n")
+
+    def test_ignora_crlf_entre_peticiones(self):
+        """Prueba que los CRLF sueltos antes de una petición en pipeline se ignoran."""
+        print("Running test_ignora_crlf_entre_peticiones...")
+        self._start(DummyService())
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            sock.sendall(
+                b"\r\nGET /properties?page=1 HTTP/1.1\r\nHost: x\r\n\r\n\r\n"
+                b"GET /properties?page=2 HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+            data = b""
+            while chunk := sock.recv(65536):
+                data += chunk
+        self.assertEqual(data.count(b"HTTP/1.1 200 OK"), 2)
+        self.assertNotIn(b"400 Bad Request", data)
+        print("test_ignora_crlf_entre_peticiones passed.\n")
+
+    def test_half_close(self):
+        """Prueba que se responde a un cliente que cierra su lado de escritura tras enviar la petición."""
+        print("Running test_half_close...")
+        self._start(DummyService(delay=0.1))
+        for version in (b"HTTP/1.0", b"HTTP/1.1"):
+            with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+                sock.sendall(b"GET /properties?page=3 " + version + b"\r\n\r\n")
+                sock.shutdown(socket.SHUT_WR)
+                data = b""
+                while chunk := sock.recv(65536):
+                    data += chunk
+            self.assertTrue(data.startswith(b"HTTP/1.1 200 OK"), data)
+            self.assertIn(b'"page": "3"', data)
+        print("test_half_close passed.\n")
+
+    def test_consultas_lentas_concurrentes(self):
+        """Prueba que las consultas lentas no bloquean el event loop."""
+        print("Running test_consultas_lentas_concurrentes...")
+        self._start(DummyService(delay=0.3), max_workers=4)
+        results = []
+
+        def fetch():
+            conn = HTTPConnection("127.0.0.1", self.port, timeout=5)
+            conn.request("GET", "/properties")
+            results.append(conn.getresponse().status)
+            conn.close()
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=fetch) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [200] * 4)
+        self.assertLess(time.monotonic() - start, 1.0)
+        print("test_consultas_lentas_concurrentes passed.\n")
+
+    def test_cola_llena_responde_503(self):
+        """Prueba que por encima de max_pending se responde 503 en lugar de encolar sin límite."""
+        print("Running test_cola_llena_responde_503...")
+        self._start(DummyService(delay=0.3), max_workers=1, max_pending=2)
+        results = []
+
+        def fetch():
+            conn = HTTPConnection("127.0.0.1", self.port, timeout=5)
+            conn.request("GET", "/properties")
+            resp = conn.getresponse()
+            resp.read()
+            results.append(resp.status)
+            conn.close()
+
+        threads = [threading.Thread(target=fetch) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(results), [200, 200, 503, 503])
+        print("test_cola_llena_responde_503 passed.\n")
+
+    def test_no_consulta_si_el_cliente_se_fue(self):
+        """Prueba que una petición en cola cuyo cliente abortó la conexión no llega al servicio."""
+        print("Running test_no_consulta_si_el_cliente_se_fue...")
+        service = DummyService(delay=0.3)
+        self._start(service, max_workers=1)
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", "/properties?page=1")
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            sock.sendall(b"GET /properties?page=2 HTTP/1.1\r\nHost: x\r\n\r\n")
+            time.sleep(0.05)
+            # Cierre abortivo (RST): un cierre limpio sería indistinguible de un half-close
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        resp = conn.getresponse()
+        self.assertEqual(json.loads(resp.read()), [{"city": "bogota", "page": "1"}])
+        conn.close()
+        time.sleep(0.1)
+        self.assertEqual(service.calls, 1)
+        print("test_no_consulta_si_el_cliente_se_fue passed.\n")
+
+    def test_payload_no_serializable(self):
+        """Prueba que si el payload no se puede serializar se responde 500 y se cierra la conexión."""
+        print("Running test_payload_no_serializable...")
+        self._start(DecimalService())
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            sock.sendall(b"GET /properties HTTP/1.1\r\nHost: x\r\n\r\n")
+            data = b""
+            while chunk := sock.recv(65536):
+                data += chunk
+        self.assertTrue(data.startswith(b"HTTP/1.1 500 Internal Server Error"), data)
+        self.assertIn(b"Connection: close", data)
+        self.assertIn(b'"error": "internal_error"', data)
+        print("test_payload_no_serializable passed.\n")
+
+    def test_cierra_conexiones_ociosas(self):
+        """Prueba que una conexión keep-alive sin peticiones se cierra tras el timeout."""
+        print("Running test_cierra_conexiones_ociosas...")
+        self._start(DummyService(), keepalive_timeout=0.1)
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            self.assertEqual(sock.recv(1), b"")
+        print("test_cierra_conexiones_ociosas passed.\n")
+
+    def test_peticion_malformada(self):
+        """Prueba que una petición inválida recibe 400 y se cierra la conexión."""
+        print("Running test_peticion_malformada...")
+        self._start(DummyService())
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            sock.sendall(b"esto no es http\r\n\r\n")
+            data = b""
+            while chunk := sock.recv(65536):
+                data += chunk
+        self.assertTrue(data.startswith(b"HTTP/1.1 400 Bad Request"))
+        print("test_peticion_malformada passed.\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
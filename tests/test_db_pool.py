@@ -0,0 +1,346 @@
+import unittest
+from collections import Counter
+
+from mysql.connector import errors
+
+from app import data_access, db_pool
+
+
+# -------------------------- Fakes -------------------------------------
+class FakeConnection:
+    """Conexión falsa que recuerda a qué host pertenece."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.connected = True
+        self.rollbacks = 0
+
+    def is_connected(self):
+        return self.connected
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.connected = False
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+
+class FakeCursor:
+
+    def __init__(self, cnx):
+        self.cnx = cnx
+
+    def execute(self, query, params):
+        if not self.cnx.connected:
+            raise errors.InterfaceError("Lost connection to MySQL server")
+
+    def fetchall(self):
+        return [{"city": "bogota", "host": self.cnx.host}]
+
+    def close(self):
+        pass
+
+
+class FakeConnector:
+    """Sustituye a `mysql.connector.connect`; los hosts en `down` fallan al conectar."""
+
+    def __init__(self, down=()):
+        self.down = set(down)
+        self.calls = []
+        self.timeouts = []
+
+    def __call__(self, user, password, host, port, database, connection_timeout=None):
+        self.calls.append(host)
+        self.timeouts.append(connection_timeout)
+        if host in self.down:
+            raise errors.InterfaceError(f"Can't connect to MySQL server on '{host}'")
+        return FakeConnection(host, port)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TimedConnector(FakeConnector):
+    """Conector cuyo connect y ping hacen avanzar un reloj falso: connect es caro y el
+    ping de cada host cuesta lo indicado en `pings`."""
+
+    CONNECT_COST = 0.010
+
+    def __init__(self, clock, pings):
+        super().__init__()
+        self.clock = clock
+        self.pings = pings
+
+    def __call__(self, user, password, host, port, database, connection_timeout=None):
+        self.clock.now += self.CONNECT_COST
+        cnx = super().__call__(user, password, host, port, database, connection_timeout)
+        ping, clock = self.pings[host], self.clock
+
+        def is_connected():
+            clock.now += ping
+            return cnx.connected
+        cnx.is_connected = is_connected
+        return cnx
+
+
+class LostConnectionConnector(FakeConnector):
+    """Conector cuyas conexiones abren bien pero pierden la conexión al ejecutar la consulta."""
+
+    def __call__(self, user, password, host, port, database, connection_timeout=None):
+        cnx = super().__call__(user, password, host, port, database, connection_timeout)
+
+        def cursor(dictionary=False):
+            cur = FakeCursor(cnx)
+
+            def execute(query, params):
+                raise errors.OperationalError("Lost connection to MySQL server during query")
+            cur.execute = execute
+            return cur
+        cnx.cursor = cursor
+        return cnx
+
+
+def make_config(**overrides):
+    attrs = dict(
+        DB_USER="user", DB_PASSWORD="pass", DB_NAME="db",
+        DB_HOST="primary", DB_PORT=3306,
+        DB_FAILOVER_HOSTS=[("standby", 3306)],
+        DB_READ_REPLICAS=[("replica1", 3306), ("replica2", 3306)],
+        DB_READ_STRATEGY="round_robin",
+        DB_POOL_SIZE=2,
+        DB_BREAKER_THRESHOLD=2,
+        DB_BREAKER_COOLDOWN=30,
+        DB_CONNECT_TIMEOUT=3,
+    )
+    attrs.update(overrides)
+    return type("MockConfig", (), attrs)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_abre_y_vuelve_a_probar_tras_cooldown(self):
+        """Prueba que el circuito se abre tras `threshold` fallos y admite un intento tras el cooldown."""
+        print("Running test_abre_y_vuelve_a_probar_tras_cooldown...")
+        clock = FakeClock()
+        breaker = db_pool.CircuitBreaker(threshold=2, cooldown=10, clock=clock)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow_request())
+
+        clock.now = 10
+        self.assertTrue(breaker.allow_request())   # intento de prueba
+        self.assertFalse(breaker.allow_request())  # solo uno a la vez
+        breaker.record_success()
+        self.assertFalse(breaker.is_open)
+        print("test_abre_y_vuelve_a_probar_tras_cooldown passed.\n")
+
+
+class TestDatabaseRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        db_pool.reset_routers()
+
+    def test_lecturas_round_robin_entre_replicas(self):
+        """Prueba que las lecturas se reparten entre réplicas."""
+        print("Running test_lecturas_round_robin_entre_replicas...")
+        router = db_pool.DatabaseRouter(FakeConnector(), make_config(), clock=self.clock)
+        hosts = []
+        for _ in range(4):
+            cnx = router.acquire(read_only=True)
+            hosts.append(cnx.host)
+            db_pool.release(cnx)
+        self.assertEqual(hosts, ["replica1", "replica2", "replica1", "replica2"])
+        print("test_lecturas_round_robin_entre_replicas passed.\n")
+
+    def test_escrituras_van_al_primario(self):
+        """Prueba que sin read_only se usa el primario."""
+        print("Running test_escrituras_van_al_primario...")
+        router = db_pool.DatabaseRouter(FakeConnector(), make_config(), clock=self.clock)
+        cnx = router.acquire()
+        self.assertEqual(cnx.host, "primary")
+        print("test_escrituras_van_al_primario passed.\n")
+
+    def test_lecturas_por_latencia(self):
+        """Prueba que la estrategia 'latency' mide el ping en cada endpoint y prefiere la réplica más rápida."""
+        print("Running test_lecturas_por_latencia...")
+        connector = TimedConnector(self.clock, {"replica1": 0.005, "replica2": 0.001})
+        router = db_pool.DatabaseRouter(
+            connector, make_config(DB_READ_STRATEGY="latency"), clock=self.clock)
+        hosts = Counter()
+        for _ in range(200):
+            cnx = router.acquire(read_only=True)
+            hosts[cnx.host] += 1
+            db_pool.release(cnx)
+        # replica1 se mide una vez; el tiempo de connect no se mezcla con los pings
+        self.assertEqual(hosts, Counter({"replica2": 199, "replica1": 1}))
+
+        # Pasado el TTL la réplica descartada se vuelve a medir
+        self.clock.now += db_pool.Endpoint.LATENCY_TTL + 1
+        cnx = router.acquire(read_only=True)
+        self.assertEqual(cnx.host, "replica1")
+        print("test_lecturas_por_latencia passed.\n")
+
+    def test_failover_del_primario(self):
+        """Prueba que si el primario cae se conmuta al standby y se deja de intentar tras abrir el circuito."""
+        print("Running test_failover_del_primario...")
+        connector = FakeConnector(down={"primary"})
+        router = db_pool.DatabaseRouter(connector, make_config(), clock=self.clock)
+        for _ in range(3):
+            cnx = router.acquire()
+            self.assertEqual(cnx.host, "standby")
+            db_pool.release(cnx)
+        # Dos fallos abren el circuito: el tercer acquire ya no intenta el primario
+        self.assertEqual(connector.calls.count("primary"), 2)
+        self.assertTrue(router.primaries[0].breaker.is_open)
+
+        # Tras el cooldown el primario se recupera y vuelve a usarse
+        connector.down.clear()
+        self.clock.now = 30
+        cnx = router.acquire()
+        self.assertEqual(cnx.host, "primary")
+        self.assertFalse(router.primaries[0].breaker.is_open)
+        print("test_failover_del_primario passed.\n")
+
+    def test_lecturas_caen_al_primario_sin_replicas(self):
+        """Prueba que si todas las réplicas fallan la lectura se sirve desde el primario."""
+        print("Running test_lecturas_caen_al_primario_sin_replicas...")
+        connector = FakeConnector(down={"replica1", "replica2"})
+        router = db_pool.DatabaseRouter(connector, make_config(), clock=self.clock)
+        cnx = router.acquire(read_only=True)
+        self.assertEqual(cnx.host, "primary")
+        print("test_lecturas_caen_al_primario_sin_replicas passed.\n")
+
+    def test_todos_los_endpoints_caidos(self):
+        """Prueba que con todos los circuitos abiertos se intenta igualmente el último candidato."""
+        print("Running test_todos_los_endpoints_caidos...")
+        connector = FakeConnector(down={"primary", "standby"})
+        router = db_pool.DatabaseRouter(
+            connector, make_config(DB_BREAKER_THRESHOLD=1), clock=self.clock)
+        with self.assertRaises(db_pool.DatabaseUnavailableError):
+            router.acquire()
+        self.assertEqual(connector.calls, ["primary", "standby"])
+        with self.assertRaises(db_pool.DatabaseUnavailableError):
+            router.acquire()
+        self.assertEqual(connector.calls, ["primary", "standby", "standby"])
+        print("test_todos_los_endpoints_caidos passed.\n")
+
+    def test_un_solo_endpoint_se_recupera_sin_esperar_cooldown(self):
+        """Prueba que con un único endpoint un corte breve no bloquea la BD durante el cooldown."""
+        print("Running test_un_solo_endpoint_se_recupera_sin_esperar_cooldown...")
+        connector = FakeConnector(down={"primary"})
+        cfg = make_config(DB_FAILOVER_HOSTS=[], DB_READ_REPLICAS=[], DB_BREAKER_THRESHOLD=3)
+        for _ in range(3):
+            with self.assertRaises(db_pool.DatabaseUnavailableError):
+                data_access.get_db_connection(connector=connector, cfg=cfg)
+        self.assertTrue(db_pool.get_router(connector, cfg).primaries[0].breaker.is_open)
+
+        connector.down.clear()
+        cnx = data_access.get_db_connection(connector=connector, cfg=cfg)
+        self.assertEqual(cnx.host, "primary")
+        self.assertEqual(len(connector.calls), 4)
+        self.assertFalse(db_pool.get_router(connector, cfg).primaries[0].breaker.is_open)
+        # Sin fail-fast, cada intento queda acotado por el timeout de conexión
+        self.assertEqual(connector.timeouts, [3, 3, 3, 3])
+        print("test_un_solo_endpoint_se_recupera_sin_esperar_cooldown passed.\n")
+
+    def test_pool_reutiliza_conexiones(self):
+        """Prueba que las conexiones devueltas se reutilizan y las muertas se descartan."""
+        print("Running test_pool_reutiliza_conexiones...")
+        connector = FakeConnector()
+        router = db_pool.DatabaseRouter(connector, make_config(), clock=self.clock)
+        cnx = router.acquire()
+        db_pool.release(cnx)
+        self.assertIs(router.acquire(), cnx)
+        self.assertEqual(cnx.rollbacks, 1)
+        db_pool.release(cnx)
+
+        cnx.connected = False
+        self.assertIsNot(router.acquire(), cnx)
+        self.assertEqual(len(connector.calls), 2)
+        print("test_pool_reutiliza_conexiones passed.\n")
+
+
+class TestDataAccessRouting(unittest.TestCase):
+
+    def tearDown(self):
+        db_pool.reset_routers()
+
+    def test_query_usa_replica(self):
+        """Prueba que query_filtered_properties lee desde una réplica con el conector inyectado."""
+        print("Running test_query_usa_replica...")
+        props = data_access.query_filtered_properties(
+            page_number=1, page_size=10, connector=FakeConnector(), cfg=make_config())
+        self.assertEqual(props[0]["host"], "replica1")
+        print("test_query_usa_replica passed.\n")
+
+    def test_query_reintenta_si_se_pierde_la_conexion(self):
+        """Prueba que una conexión perdida a mitad de consulta se descarta y se reintenta evitando ese endpoint."""
+        print("Running test_query_reintenta_si_se_pierde_la_conexion...")
+        connector = FakeConnector()
+        cfg = make_config(DB_READ_REPLICAS=[("replica1", 3306)])
+        cnx = data_access.get_db_connection(connector=connector, cfg=cfg, read_only=True)
+        data_access.close_db_connection(cnx)
+        cnx.connected = False  # muere estando ociosa y no lo detectamos hasta ejecutar
+        cnx.is_connected = lambda: True
+
+        props = data_access.query_filtered_properties(
+            page_number=1, page_size=10, connector=connector, cfg=cfg)
+        self.assertIsNotNone(props)
+        self.assertEqual(props[0]["host"], "primary")
+        self.assertEqual(connector.calls, ["replica1", "primary"])
+        print("test_query_reintenta_si_se_pierde_la_conexion passed.\n")
+
+    def test_query_reintenta_en_el_mismo_host_si_es_el_unico(self):
+        """Prueba que con un único endpoint el reintento vuelve al mismo host."""
+        print("Running test_query_reintenta_en_el_mismo_host_si_es_el_unico...")
+        connector = FakeConnector()
+        cfg = make_config(DB_FAILOVER_HOSTS=[], DB_READ_REPLICAS=[])
+        cnx = data_access.get_db_connection(connector=connector, cfg=cfg, read_only=True)
+        data_access.close_db_connection(cnx)
+        cnx.connected = False
+        cnx.is_connected = lambda: True
+
+        props = data_access.query_filtered_properties(
+            page_number=1, page_size=10, connector=connector, cfg=cfg)
+        self.assertEqual(props[0]["host"], "primary")
+        self.assertEqual(connector.calls, ["primary", "primary"])
+        print("test_query_reintenta_en_el_mismo_host_si_es_el_unico passed.\n")
+
+    def test_query_falla_si_todos_los_intentos_pierden_la_conexion(self):
+        """Prueba que si todos los intentos pierden la conexión se lanza DatabaseUnavailableError y no None."""
+        print("Running test_query_falla_si_todos_los_intentos_pierden_la_conexion...")
+        connector = LostConnectionConnector()
+        cfg = make_config(DB_FAILOVER_HOSTS=[], DB_READ_REPLICAS=[])
+        with self.assertRaises(db_pool.DatabaseUnavailableError) as ctx:
+            data_access.query_filtered_properties(
+                page_number=1, page_size=10, connector=connector, cfg=cfg)
+        self.assertIsInstance(ctx.exception.__cause__, errors.OperationalError)
+        self.assertEqual(connector.calls, ["primary", "primary"])
+        print("test_query_falla_si_todos_los_intentos_pierden_la_conexion passed.\n")
+
+    def test_get_db_connection_falla_si_todo_cae(self):
+        """Prueba que sin endpoints disponibles se lanza DatabaseUnavailableError en lugar de devolver None."""
+        print("Running test_get_db_connection_falla_si_todo_cae...")
+        connector = FakeConnector(down={"primary", "standby"})
+        with self.assertRaises(db_pool.DatabaseUnavailableError) as ctx:
+            data_access.get_db_connection(connector=connector, cfg=make_config())
+        self.assertIsInstance(ctx.exception.__cause__, errors.InterfaceError)
+        print("test_get_db_connection_falla_si_todo_cae passed.\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ import time
 import unittest
 from http.client import HTTPConnection
 
+from app.db_pool import DatabaseUnavailableError
 from app.server import PropertyServer
 
 
@@ -15,6 +16,8 @@ class DummyService:
 
     def get_properties(self, **kwargs):
         self.last_call = kwargs
+        if kwargs["city"] == "caida":
+            raise DatabaseUnavailableError("No hay endpoints de base de datos disponibles.")
         return [{
             "city":        "bogota",
             "address":     "Calle Falsa 123",
@@ -71,6 +74,14 @@ class TestHTTPHandlers(unittest.TestCase):
         self.assertEqual(body["error"], "not_found")
         print("test_not_found passed.\n")
 
+    def test_base_de_datos_no_disponible(self):
+        """Prueba que sin base de datos se responde 503 en lugar de una lista vacía."""
+        print("Running test_base_de_datos_no_disponible...")
+        status, body = self._request("/properties?city=caida")
+        self.assertEqual(status, 503)
+        self.assertEqual(body["error"], "service_unavailable")
+        print("test_base_de_datos_no_disponible passed.\n")
+
 
 if __name__ == "__main__":
     unittest.main()